@@ -18,9 +18,11 @@ DOCUMENTATION = '''
         - L(Docker SDK for Python,https://docker-py.readthedocs.io/en/stable/) >= 1.10.0
     extends_documentation_fragment:
         - constructed
+        - inventory_cache
     description:
         - Reads inventories from the Docker swarm API.
         - Uses a YAML configuration file docker_swarm.[yml|yaml].
+        - Since community.docker 3.7.0, the inventory cache can be used to avoid querying the Docker swarm API on every run.
         - "The plugin returns following groups of swarm nodes:  C(all) - all hosts; C(workers) - all worker nodes;
           C(managers) - all manager nodes; C(leader) - the swarm leader node;
           C(nonleaders) - all nodes except the swarm leader."
@@ -154,7 +156,7 @@ from ansible.errors import AnsibleError
 from ansible.module_utils.common.text.converters import to_native
 from ansible_collections.community.docker.plugins.module_utils.common import get_connect_params
 from ansible_collections.community.docker.plugins.module_utils.util import update_tls_hostname
-from ansible.plugins.inventory import BaseInventoryPlugin, Constructable
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
 from ansible.parsing.utils.addresses import parse_address
 
 try:
@@ -164,7 +166,10 @@ except ImportError:
     HAS_DOCKER = False
 
 
-class InventoryModule(BaseInventoryPlugin, Constructable):
+_INVENTORY_SUFFIXES = ('docker_swarm.yaml', 'docker_swarm.yml')
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     ''' Host inventory parser for ansible using Docker swarm as source. '''
 
     NAME = 'community.docker.docker_swarm'
@@ -172,7 +177,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
     def _fail(self, msg):
         raise AnsibleError(msg)
 
-    def _populate(self):
+    def _get_nodes(self):
         raw_params = dict(
             docker_host=self.get_option('docker_host'),
             tls=self.get_option('tls'),
@@ -190,13 +195,29 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
         update_tls_hostname(raw_params)
         connect_params = get_connect_params(raw_params, fail_function=self._fail)
         self.client = docker.DockerClient(**connect_params)
+        try:
+            # The node list returned by the API already contains the full node information,
+            # so there is no need to inspect every node separately
+            return [node.attrs for node in self.client.nodes.list()]
+        except Exception as e:
+            raise AnsibleError('Unable to fetch hosts from Docker swarm API, this was the original exception: %s' %
+                               to_native(e))
+
+    def _populate(self, nodes):
         self.inventory.add_group('all')
         self.inventory.add_group('manager')
         self.inventory.add_group('worker')
         self.inventory.add_group('leader')
         self.inventory.add_group('nonleaders')
 
-        if self.get_option('include_host_uri'):
+        include_host_uri = self.get_option('include_host_uri')
+        verbose_output = self.get_option('verbose_output')
+        strict = self.get_option('strict')
+        compose = self.get_option('compose')
+        groups = self.get_option('groups')
+        keyed_groups = self.get_option('keyed_groups')
+
+        if include_host_uri:
             if self.get_option('include_host_uri_port'):
                 host_uri_port = str(self.get_option('include_host_uri_port'))
             elif self.get_option('tls') or self.get_option('validate_certs'):
@@ -205,59 +226,46 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
                 host_uri_port = '2375'
 
         try:
-            self.nodes = self.client.nodes.list()
-            for self.node in self.nodes:
-                self.node_attrs = self.client.nodes.get(self.node.id).attrs
-                self.inventory.add_host(self.node_attrs['ID'])
-                self.inventory.add_host(self.node_attrs['ID'], group=self.node_attrs['Spec']['Role'])
-                self.inventory.set_variable(self.node_attrs['ID'], 'ansible_host',
-                                            self.node_attrs['Status']['Addr'])
-                if self.get_option('include_host_uri'):
-                    self.inventory.set_variable(self.node_attrs['ID'], 'ansible_host_uri',
-                                                'tcp://' + self.node_attrs['Status']['Addr'] + ':' + host_uri_port)
-                if self.get_option('verbose_output'):
-                    self.inventory.set_variable(self.node_attrs['ID'], 'docker_swarm_node_attributes', self.node_attrs)
-                if 'ManagerStatus' in self.node_attrs:
-                    if self.node_attrs['ManagerStatus'].get('Leader'):
-                        # This is workaround of bug in Docker when in some cases the Leader IP is 0.0.0.0
-                        # Check moby/moby#35437 for details
-                        swarm_leader_ip = parse_address(self.node_attrs['ManagerStatus']['Addr'])[0] or \
-                            self.node_attrs['Status']['Addr']
-                        if self.get_option('include_host_uri'):
-                            self.inventory.set_variable(self.node_attrs['ID'], 'ansible_host_uri',
-                                                        'tcp://' + swarm_leader_ip + ':' + host_uri_port)
-                        self.inventory.set_variable(self.node_attrs['ID'], 'ansible_host', swarm_leader_ip)
-                        self.inventory.add_host(self.node_attrs['ID'], group='leader')
-                    else:
-                        self.inventory.add_host(self.node_attrs['ID'], group='nonleaders')
+            for node_attrs in nodes:
+                node_id = node_attrs['ID']
+                status_addr = node_attrs['Status']['Addr']
+                manager_status = node_attrs.get('ManagerStatus')
+                self.inventory.add_host(node_id)
+                self.inventory.add_host(node_id, group=node_attrs['Spec']['Role'])
+                self.inventory.set_variable(node_id, 'ansible_host', status_addr)
+                if include_host_uri:
+                    self.inventory.set_variable(node_id, 'ansible_host_uri', 'tcp://' + status_addr + ':' + host_uri_port)
+                if verbose_output:
+                    self.inventory.set_variable(node_id, 'docker_swarm_node_attributes', node_attrs)
+                if manager_status is not None and manager_status.get('Leader'):
+                    # This is workaround of bug in Docker when in some cases the Leader IP is 0.0.0.0
+                    # Check moby/moby#35437 for details
+                    swarm_leader_ip = parse_address(manager_status['Addr'])[0] or status_addr
+                    if include_host_uri:
+                        self.inventory.set_variable(node_id, 'ansible_host_uri', 'tcp://' + swarm_leader_ip + ':' + host_uri_port)
+                    self.inventory.set_variable(node_id, 'ansible_host', swarm_leader_ip)
+                    self.inventory.add_host(node_id, group='leader')
                 else:
-                    self.inventory.add_host(self.node_attrs['ID'], group='nonleaders')
+                    self.inventory.add_host(node_id, group='nonleaders')
                 # Use constructed if applicable
-                strict = self.get_option('strict')
                 # Composed variables
-                self._set_composite_vars(self.get_option('compose'),
-                                         self.node_attrs,
-                                         self.node_attrs['ID'],
-                                         strict=strict)
+                if compose:
+                    self._set_composite_vars(compose, node_attrs, node_id, strict=strict)
                 # Complex groups based on jinja2 conditionals, hosts that meet the conditional are added to group
-                self._add_host_to_composed_groups(self.get_option('groups'),
-                                                  self.node_attrs,
-                                                  self.node_attrs['ID'],
-                                                  strict=strict)
+                if groups:
+                    self._add_host_to_composed_groups(groups, node_attrs, node_id, strict=strict)
                 # Create groups based on variable values and add the corresponding hosts to it
-                self._add_host_to_keyed_groups(self.get_option('keyed_groups'),
-                                               self.node_attrs,
-                                               self.node_attrs['ID'],
-                                               strict=strict)
+                if keyed_groups:
+                    self._add_host_to_keyed_groups(keyed_groups, node_attrs, node_id, strict=strict)
         except Exception as e:
-            raise AnsibleError('Unable to fetch hosts from Docker swarm API, this was the original exception: %s' %
+            raise AnsibleError('Unable to add Docker swarm nodes to the inventory, this was the original exception: %s' %
                                to_native(e))
 
     def verify_file(self, path):
         """Return the possibly of a file being consumable by this plugin."""
         return (
             super(InventoryModule, self).verify_file(path) and
-            path.endswith(('docker_swarm.yaml', 'docker_swarm.yml')))
+            path.endswith(_INVENTORY_SUFFIXES))
 
     def parse(self, inventory, loader, path, cache=True):
         if not HAS_DOCKER:
@@ -265,4 +273,22 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
                                'https://github.com/docker/docker-py.')
         super(InventoryModule, self).parse(inventory, loader, path, cache)
         self._read_config_data(path)
-        self._populate()
+
+        cache_key = self.get_cache_key(path)
+        # Only read from the cache if the user enabled caching and the inventory is not being refreshed
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        nodes = None
+        if attempt_to_read_cache:
+            try:
+                nodes = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+        if nodes is None:
+            nodes = self._get_nodes()
+        if cache_needs_update:
+            self._cache[cache_key] = nodes
+
+        self._populate(nodes)
@@ -12,11 +12,19 @@ import re
 from collections import namedtuple
 
 from ansible.module_utils.common.text.converters import to_native
+from ansible.module_utils.six import binary_type, text_type
 from ansible.module_utils.six.moves import shlex_quote
 
 from ansible_collections.community.docker.plugins.module_utils.util import DockerBaseClass
 from ansible_collections.community.docker.plugins.module_utils.version import LooseVersion
 
+try:
+    from shlex import join as shlex_join
+except ImportError:
+    # Python < 3.8
+    def shlex_join(split_command):
+        return ' '.join(shlex_quote(arg) for arg in split_command)
+
 
 DOCKER_COMPOSE_FILES = 'docker-compose.yml', 'docker-compose.yaml'
 
@@ -57,6 +65,18 @@ DOCKER_STATUS_ERROR = frozenset((
 ))
 DOCKER_STATUS = frozenset(DOCKER_STATUS_DONE | DOCKER_STATUS_WORKING | DOCKER_STATUS_PULL | DOCKER_STATUS_ERROR)
 
+_STATUS_KIND_WORKING = 'working'
+_STATUS_KIND_ERROR = 'error'
+
+# Maps working and error statuses to their kind, so that a single lookup is enough to classify an event.
+# Other statuses (like the ones in DOCKER_STATUS_DONE) have no kind.
+_STATUS_KIND = {}
+for _status in DOCKER_STATUS_WORKING:
+    _STATUS_KIND[_status] = _STATUS_KIND_WORKING
+for _status in DOCKER_STATUS_ERROR:
+    _STATUS_KIND[_status] = _STATUS_KIND_ERROR
+del _status
+
 
 class ResourceType(object):
     UNKNOWN = "unknown"
@@ -69,12 +89,15 @@ class ResourceType(object):
     @classmethod
     def from_docker_compose_event(cls, resource_type):
         # type: (Type[ResourceType], Text) -> Any
-        return {
-            "Network": cls.NETWORK,
-            "Image": cls.IMAGE,
-            "Volume": cls.VOLUME,
-            "Container": cls.CONTAINER,
-        }[resource_type]
+        return _RESOURCE_TYPE_FROM_EVENT[resource_type]
+
+
+_RESOURCE_TYPE_FROM_EVENT = {
+    "Network": ResourceType.NETWORK,
+    "Image": ResourceType.IMAGE,
+    "Volume": ResourceType.VOLUME,
+    "Container": ResourceType.CONTAINER,
+}
 
 
 Event = namedtuple(
@@ -85,46 +108,86 @@ Event = namedtuple(
 
 _DRY_RUN_MARKER = 'DRY-RUN MODE -'
 
-_RE_RESOURCE_EVENT = re.compile(
+
+def _regex_alternation(strings):
+    # Create a regular expression that matches exactly one of the given strings. Common prefixes
+    # are factored out (Pulled and Pulling result in Pull(?:ed|ing)), and the result does not
+    # depend on the iteration order of the strings.
+    trie = {}
+    for string in strings:
+        node = trie
+        for char in string:
+            node = node.setdefault(char, {})
+        # The empty key marks the end of a string
+        node[''] = {}
+
+    def convert(node):
+        branches = [re.escape(char) + convert(node[char]) for char in sorted(node) if char]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:{0}){1}'.format('|'.join(branches), '?' if optional else '')
+
+    return convert(trie)
+
+
+# Resource events are the most common ones, so they are tried first. The order of the alternatives
+# is the same in which the individual event types have to be tried.
+_RE_EVENT = re.compile(
     r'^'
     r'\s*'
+    r'(?:'
     r'(?P<resource_type>Network|Image|Volume|Container)'
     r'\s+'
     r'(?P<resource_id>\S+)'
     r'\s+'
-    r'(?P<status>\S(?:|.*\S))'
-    r'\s*'
-    r'$'
-)
-
-_RE_PULL_EVENT = re.compile(
-    r'^'
-    r'\s*'
-    r'(?P<service>\S+)'
+    r'(?P<resource_status>\S(?:|.*\S))'
+    r'|'
+    r'(?P<pull_service>\S+)'
     r'\s+'
-    r'(?P<status>%s)'
-    r'\s*'
-    r'$'
-    % '|'.join(re.escape(status) for status in DOCKER_STATUS_PULL)
-)
-
-_RE_ERROR_EVENT = re.compile(
-    r'^'
-    r'\s*'
-    r'(?P<resource_id>\S+)'
+    r'(?P<pull_status>%s)'
+    r'|'
+    r'(?P<error_resource_id>\S+)'
     r'\s+'
-    r'(?P<status>%s)'
+    r'(?P<error_status>%s)'
+    r')'
     r'\s*'
     r'$'
-    % '|'.join(re.escape(status) for status in DOCKER_STATUS_ERROR)
+    % (
+        _regex_alternation(DOCKER_STATUS_PULL),
+        _regex_alternation(DOCKER_STATUS_ERROR),
+    )
 )
 
 
+# The same line boundaries as bytes.splitlines(); str.splitlines() would also split on
+# characters like form feeds or vertical tabs
+_RE_LINE_SEPARATOR = re.compile(r'\r\n|\r|\n')
+
+
+def _iterate_lines(stderr):
+    if isinstance(stderr, (binary_type, text_type)):
+        return _RE_LINE_SEPARATOR.split(to_native(stderr))
+    # An iterable of lines, for example a pipe that is read from while the command is still running
+    return (to_native(line) for line in stderr)
+
+
+def _finish_error_event(events, error_event, error_lines):
+    # Replace the last event, which is the error event, by one with the collected message lines
+    if error_event.msg is not None:
+        error_lines.insert(0, error_event.msg)
+    events[-1] = error_event._replace(msg='\n'.join(error_lines))
+
+
 def parse_events(stderr, dry_run=False, warn_function=None):
     events = []
     error_event = None
-    for line in stderr.splitlines():
-        line = to_native(line.strip())
+    # Lines that belong to the message of error_event; joined once the error event is complete
+    error_lines = []
+    for line in _iterate_lines(stderr):
+        line = line.strip()
         if not line:
             continue
         if dry_run:
@@ -138,14 +201,21 @@ def parse_events(stderr, dry_run=False, warn_function=None):
                     'https://github.com/ansible-collections/community.docker/issues/new?assignees=&labels=&projects=&template=bug_report.md'
                     .format(line)
                 )
-        match = _RE_RESOURCE_EVENT.match(line)
-        if match is not None:
-            status = match.group('status')
+        match = _RE_EVENT.match(line)
+        if match is None and error_event is not None:
+            # Unparsable line that apparently belongs to the previous error event
+            error_lines.append(line)
+            continue
+        if error_lines:
+            _finish_error_event(events, error_event, error_lines)
+            error_lines = []
+        if match is not None and match.group('resource_type') is not None:
+            status = match.group('resource_status')
             msg = None
             if status not in DOCKER_STATUS:
                 status, msg = msg, status
             event = Event(
-                ResourceType.from_docker_compose_event(match.group('resource_type')),
+                _RESOURCE_TYPE_FROM_EVENT[match.group('resource_type')],
                 match.group('resource_id'),
                 status,
                 msg,
@@ -156,38 +226,26 @@ def parse_events(stderr, dry_run=False, warn_function=None):
             else:
                 error_event = None
             continue
-        match = _RE_PULL_EVENT.match(line)
-        if match:
+        if match is not None and match.group('pull_service') is not None:
             events.append(
                 Event(
                     ResourceType.SERVICE,
-                    match.group('service'),
-                    match.group('status'),
+                    match.group('pull_service'),
+                    match.group('pull_status'),
                     None,
                 )
             )
             error_event = None
             continue
-        match = _RE_ERROR_EVENT.match(line)
-        if match:
+        if match is not None:
             error_event = Event(
                 ResourceType.UNKNOWN,
-                match.group('resource_id'),
-                match.group('status'),
+                match.group('error_resource_id'),
+                match.group('error_status'),
                 None,
             )
             events.append(error_event)
             continue
-        if error_event is not None:
-            # Unparsable line that apparently belongs to the previous error event
-            error_event = Event(
-                error_event.resource_type,
-                error_event.resource_id,
-                error_event.status,
-                '\n'.join(msg for msg in [error_event.msg, line] if msg is not None),
-            )
-            events[-1] = error_event
-            continue
         if line.startswith('Error '):
             # Error message that is independent of an error event
             error_event = Event(
@@ -206,77 +264,99 @@ def parse_events(stderr, dry_run=False, warn_function=None):
                 'https://github.com/ansible-collections/community.docker/issues/new?assignees=&labels=&projects=&template=bug_report.md'
                 .format(line)
             )
+    if error_lines:
+        _finish_error_event(events, error_event, error_lines)
     return events
 
 
-def has_changes(events):
-    for event in events:
-        if event.status in DOCKER_STATUS_WORKING:
-            return True
-    return False
+EventSummary = namedtuple(
+    'EventSummary',
+    ['changed', 'actions', 'errors', 'warnings']
+)
 
 
-def extract_actions(events):
+def summarize_events(events):
+    changed = False
     actions = []
+    errors = []
+    warnings = []
     for event in events:
-        if event.status in DOCKER_STATUS_WORKING:
+        kind = _STATUS_KIND.get(event.status)
+        if kind == _STATUS_KIND_WORKING:
+            changed = True
             actions.append({
                 'what': event.resource_type,
                 'id': event.resource_id,
                 'status': event.status,
             })
-    return actions
+        elif kind == _STATUS_KIND_ERROR:
+            errors.append(event)
+        elif event.status is None and event.msg is not None:
+            # If a message is present, assume it is a warning
+            warnings.append(event)
+    return EventSummary(changed, actions, errors, warnings)
+
+
+def has_changes(events):
+    return summarize_events(events).changed
+
+
+def extract_actions(events):
+    return summarize_events(events).actions
+
+
+def _emit_warnings(warning_events, warn_function):
+    for event in warning_events:
+        warn_function('Docker compose: {resource_type} {resource_id}: {msg}'.format(
+            resource_type=event.resource_type,
+            resource_id=event.resource_id,
+            msg=event.msg,
+        ))
 
 
 def emit_warnings(events, warn_function):
-    for event in events:
-        # If a message is present, assume it is a warning
-        if event.status is None and event.msg is not None:
-            warn_function('Docker compose: {resource_type} {resource_id}: {msg}'.format(
-                resource_type=event.resource_type,
-                resource_id=event.resource_id,
-                msg=event.msg,
-            ))
+    _emit_warnings(summarize_events(events).warnings, warn_function)
 
 
 def is_failed(events, rc):
     if rc:
         return True
-    for event in events:
-        if event.status in DOCKER_STATUS_ERROR:
-            return True
-    return False
+    return bool(summarize_events(events).errors)
 
 
-def update_failed(result, events, args, stdout, stderr, rc, cli):
+def _update_failed(result, error_events, args, stdout, stderr, rc, cli):
+    # stdout and stderr must already be converted to native strings
     errors = []
-    for event in events:
-        if event.status in DOCKER_STATUS_ERROR:
-            msg = 'Error when processing {resource_type} {resource_id}: '
-            if event.resource_type == 'unknown':
-                msg = 'Error when processing {resource_id}: '
-                if event.resource_id == '':
-                    msg = 'General error: '
-            msg += '{status}' if event.msg is None else '{msg}'
-            errors.append(msg.format(
-                resource_type=event.resource_type,
-                resource_id=event.resource_id,
-                status=event.status,
-                msg=event.msg,
-            ))
+    for event in error_events:
+        msg = 'Error when processing {resource_type} {resource_id}: '
+        if event.resource_type == 'unknown':
+            msg = 'Error when processing {resource_id}: '
+            if event.resource_id == '':
+                msg = 'General error: '
+        msg += '{status}' if event.msg is None else '{msg}'
+        errors.append(msg.format(
+            resource_type=event.resource_type,
+            resource_id=event.resource_id,
+            status=event.status,
+            msg=event.msg,
+        ))
     if not errors and not rc:
         return False
     if not errors:
         errors.append('Return code {code} is non-zero'.format(code=rc))
     result['failed'] = True
     result['msg'] = '\n'.join(errors)
-    result['cmd'] = ' '.join(shlex_quote(arg) for arg in [cli] + args)
-    result['stdout'] = to_native(stdout)
-    result['stderr'] = to_native(stderr)
+    result['cmd'] = shlex_join([cli] + args)
+    result['stdout'] = stdout
+    result['stderr'] = stderr
     result['rc'] = rc
     return True
 
 
+def update_failed(result, events, args, stdout, stderr, rc, cli):
+    return _update_failed(result, summarize_events(events).errors, args, to_native(stdout), to_native(stderr), rc, cli)
+
+
 def common_compose_argspec():
     return dict(
         project_src=dict(type='path', required=True),
@@ -287,11 +367,17 @@ def common_compose_argspec():
 
 
 def combine_binary_output(*outputs):
-    return b'\n'.join(out for out in outputs if out)
+    outputs = [out for out in outputs if out]
+    if len(outputs) == 1:
+        return outputs[0]
+    return b'\n'.join(outputs)
 
 
 def combine_text_output(*outputs):
-    return '\n'.join(out for out in outputs if out)
+    outputs = [out for out in outputs if out]
+    if len(outputs) == 1:
+        return outputs[0]
+    return '\n'.join(outputs)
 
 
 class BaseComposeManager(DockerBaseClass):
@@ -299,6 +385,7 @@ class BaseComposeManager(DockerBaseClass):
         super(BaseComposeManager, self).__init__()
         self.client = client
         self.check_mode = self.client.check_mode
+        self._cli = self.client.get_cli()
         parameters = self.client.module.params
 
         self.project_src = parameters['project_src']
@@ -308,15 +395,22 @@ class BaseComposeManager(DockerBaseClass):
 
         compose = self.client.get_client_plugin_info('compose')
         if compose is None:
-            self.client.fail('Docker CLI {0} does not have the compose plugin installed'.format(self.client.get_cli()))
+            self.client.fail('Docker CLI {0} does not have the compose plugin installed'.format(self._cli))
         compose_version = compose['Version'].lstrip('v')
         self.compose_version = LooseVersion(compose_version)
         if self.compose_version < LooseVersion(min_version):
             self.client.fail('Docker CLI {cli} has the compose plugin with version {version}; need version {min_version} or later'.format(
-                cli=self.client.get_cli(),
+                cli=self._cli,
                 version=compose_version,
                 min_version=min_version,
             ))
+        self._compose_ge_2_19 = self.compose_version >= LooseVersion('2.19.0')
+        self._compose_ge_2_23 = self.compose_version >= LooseVersion('2.23.0')
+        if self.compose_version >= LooseVersion('2.21.0'):
+            # Breaking change in 2.21.0: https://github.com/docker/compose/pull/10918
+            self._list_containers_call = self.client.call_cli_json_stream
+        else:
+            self._list_containers_call = self.client.call_cli_json
 
         if not os.path.isdir(self.project_src):
             self.client.fail('"{0}" is not a directory'.format(self.project_src))
@@ -326,7 +420,7 @@ class BaseComposeManager(DockerBaseClass):
 
     def get_base_args(self):
         args = ['compose', '--ansi', 'never']
-        if self.compose_version >= LooseVersion('2.19.0'):
+        if self._compose_ge_2_19:
             # https://github.com/docker/compose/pull/10690
             args.extend(['--progress', 'plain'])
         args.extend(['--project-directory', self.project_src])
@@ -340,28 +434,20 @@ class BaseComposeManager(DockerBaseClass):
 
     def list_containers_raw(self):
         args = self.get_base_args() + ['ps', '--format', 'json', '--all']
-        if self.compose_version >= LooseVersion('2.23.0'):
+        if self._compose_ge_2_23:
             # https://github.com/docker/compose/pull/11038
             args.append('--no-trunc')
-        kwargs = dict(cwd=self.project_src, check_rc=True)
-        if self.compose_version >= LooseVersion('2.21.0'):
-            # Breaking change in 2.21.0: https://github.com/docker/compose/pull/10918
-            dummy, containers, dummy = self.client.call_cli_json_stream(*args, **kwargs)
-        else:
-            dummy, containers, dummy = self.client.call_cli_json(*args, **kwargs)
+        dummy, containers, dummy = self._list_containers_call(*args, cwd=self.project_src, check_rc=True)
         return containers
 
     def list_containers(self):
         result = []
         for container in self.list_containers_raw():
-            labels = {}
-            if container.get('Labels'):
-                for part in container['Labels'].split(','):
-                    label_value = part.split('=', 1)
-                    labels[label_value[0]] = label_value[1] if len(label_value) > 1 else ''
-            container['Labels'] = labels
+            labels = container.get('Labels')
+            # partition() returns (key, '=', value), or (key, '', '') for labels without value
+            container['Labels'] = dict(part.partition('=')[::2] for part in labels.split(',')) if labels else {}
             container['Names'] = container.get('Names', container['Name']).split(',')
-            container['Networks'] = container.get('Networks', '').split(',')
+            container['Networks'] = [network for network in container.get('Networks', '').split(',') if network]
             container['Publishers'] = container.get('Publishers') or []
             result.append(container)
         return result
@@ -372,27 +458,35 @@ class BaseComposeManager(DockerBaseClass):
         dummy, images, dummy = self.client.call_cli_json(*args, **kwargs)
         return images
 
+    def call_cli(self, *args, **kwargs):
+        # Run the Docker CLI and return stdout and stderr as native strings, so that they only need to be converted once
+        rc, stdout, stderr = self.client.call_cli(*args, **kwargs)
+        return rc, to_native(stdout), to_native(stderr)
+
     def parse_events(self, stderr, dry_run=False):
+        # stderr can be the complete output, or an iterable of lines
         return parse_events(stderr, dry_run=dry_run, warn_function=self.client.warn)
 
-    def emit_warnings(self, events):
-        emit_warnings(events, warn_function=self.client.warn)
+    def emit_warnings(self, summary):
+        _emit_warnings(summary.warnings, warn_function=self.client.warn)
 
-    def update_result(self, result, events, stdout, stderr):
-        result['changed'] = result.get('changed', False) or has_changes(events)
-        result['actions'] = result.get('actions', []) + extract_actions(events)
-        result['stdout'] = combine_text_output(result.get('stdout'), to_native(stdout))
-        result['stderr'] = combine_text_output(result.get('stderr'), to_native(stderr))
+    def update_result(self, result, summary, stdout, stderr):
+        # stdout and stderr must be native strings, as returned by call_cli()
+        result['changed'] = result.get('changed', False) or summary.changed
+        result['actions'] = result.get('actions', []) + summary.actions
+        result['stdout'] = combine_text_output(result.get('stdout'), stdout)
+        result['stderr'] = combine_text_output(result.get('stderr'), stderr)
 
-    def update_failed(self, result, events, args, stdout, stderr, rc):
-        return update_failed(
+    def update_failed(self, result, summary, args, stdout, stderr, rc):
+        # stdout and stderr must be native strings, as returned by call_cli()
+        return _update_failed(
             result,
-            events,
+            summary.errors,
             args=args,
             stdout=stdout,
             stderr=stderr,
             rc=rc,
-            cli=self.client.get_cli(),
+            cli=self._cli,
         )
 
     def cleanup_result(self, result):
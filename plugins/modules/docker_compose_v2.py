@@ -379,7 +379,7 @@ from ansible_collections.community.docker.plugins.module_utils.common_cli import
 from ansible_collections.community.docker.plugins.module_utils.compose_v2 import (
     BaseComposeManager,
     common_compose_argspec,
-    is_failed,
+    summarize_events,
 )
 
 
@@ -439,11 +439,11 @@ class ServicesManager(BaseComposeManager):
     def cmd_up(self):
         result = dict()
         args = self.get_up_cmd(self.check_mode)
-        rc, stdout, stderr = self.client.call_cli(*args, cwd=self.project_src)
-        events = self.parse_events(stderr, dry_run=self.check_mode)
-        self.emit_warnings(events)
-        self.update_result(result, events, stdout, stderr)
-        self.update_failed(result, events, args, stdout, stderr, rc)
+        rc, stdout, stderr = self.call_cli(*args, cwd=self.project_src)
+        summary = summarize_events(self.parse_events(stderr, dry_run=self.check_mode))
+        self.emit_warnings(summary)
+        self.update_result(result, summary, stdout, stderr)
+        self.update_failed(result, summary, args, stdout, stderr, rc)
         return result
 
     def get_stop_cmd(self, dry_run):
@@ -468,26 +468,26 @@ class ServicesManager(BaseComposeManager):
         result = dict()
         # Make sure all containers are created
         args_1 = self.get_up_cmd(self.check_mode, no_start=True)
-        rc_1, stdout_1, stderr_1 = self.client.call_cli(*args_1, cwd=self.project_src)
-        events_1 = self.parse_events(stderr_1, dry_run=self.check_mode)
-        self.emit_warnings(events_1)
-        self.update_result(result, events_1, stdout_1, stderr_1)
-        is_failed_1 = is_failed(events_1, rc_1)
+        rc_1, stdout_1, stderr_1 = self.call_cli(*args_1, cwd=self.project_src)
+        summary_1 = summarize_events(self.parse_events(stderr_1, dry_run=self.check_mode))
+        self.emit_warnings(summary_1)
+        self.update_result(result, summary_1, stdout_1, stderr_1)
+        is_failed_1 = bool(rc_1 or summary_1.errors)
         if not is_failed_1 and not self._are_containers_stopped():
             # Make sure all containers are stopped
             args_2 = self.get_stop_cmd(self.check_mode)
-            rc_2, stdout_2, stderr_2 = self.client.call_cli(*args_2, cwd=self.project_src)
-            events_2 = self.parse_events(stderr_2, dry_run=self.check_mode)
-            self.emit_warnings(events_2)
-            self.update_result(result, events_2, stdout_2, stderr_2)
+            rc_2, stdout_2, stderr_2 = self.call_cli(*args_2, cwd=self.project_src)
+            summary_2 = summarize_events(self.parse_events(stderr_2, dry_run=self.check_mode))
+            self.emit_warnings(summary_2)
+            self.update_result(result, summary_2, stdout_2, stderr_2)
         else:
             args_2 = []
-            rc_2, stdout_2, stderr_2 = 0, b'', b''
-            events_2 = []
-        # Compose result
+            rc_2, stdout_2, stderr_2 = 0, '', ''
+            summary_2 = summarize_events([])
+        # Compose result; if the first command failed, the second one was not run
         self.update_failed(
             result,
-            events_1 + events_2,
+            summary_1 if is_failed_1 else summary_2,
             args_1 if is_failed_1 else args_2,
             stdout_1 if is_failed_1 else stdout_2,
             stderr_1 if is_failed_1 else stderr_2,
@@ -509,11 +509,11 @@ class ServicesManager(BaseComposeManager):
     def cmd_restart(self):
         result = dict()
         args = self.get_restart_cmd(self.check_mode)
-        rc, stdout, stderr = self.client.call_cli(*args, cwd=self.project_src)
-        events = self.parse_events(stderr, dry_run=self.check_mode)
-        self.emit_warnings(events)
-        self.update_result(result, events, stdout, stderr)
-        self.update_failed(result, events, args, stdout, stderr, rc)
+        rc, stdout, stderr = self.call_cli(*args, cwd=self.project_src)
+        summary = summarize_events(self.parse_events(stderr, dry_run=self.check_mode))
+        self.emit_warnings(summary)
+        self.update_result(result, summary, stdout, stderr)
+        self.update_failed(result, summary, args, stdout, stderr, rc)
         return result
 
     def get_down_cmd(self, dry_run):
@@ -534,11 +534,11 @@ class ServicesManager(BaseComposeManager):
     def cmd_down(self):
         result = dict()
         args = self.get_down_cmd(self.check_mode)
-        rc, stdout, stderr = self.client.call_cli(*args, cwd=self.project_src)
-        events = self.parse_events(stderr, dry_run=self.check_mode)
-        self.emit_warnings(events)
-        self.update_result(result, events, stdout, stderr)
-        self.update_failed(result, events, args, stdout, stderr, rc)
+        rc, stdout, stderr = self.call_cli(*args, cwd=self.project_src)
+        summary = summarize_events(self.parse_events(stderr, dry_run=self.check_mode))
+        self.emit_warnings(summary)
+        self.update_result(result, summary, stdout, stderr)
+        self.update_failed(result, summary, args, stdout, stderr, rc)
         return result
 
 
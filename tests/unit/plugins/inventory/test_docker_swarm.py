@@ -0,0 +1,220 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible.template import Templar
+
+try:
+    from ansible.template import trust_as_template
+except ImportError:
+    # ansible-core < 2.19 does not distinguish between trusted and untrusted templates
+    def trust_as_template(value):
+        return value
+
+from ansible_collections.community.docker.plugins.inventory import docker_swarm
+from ansible_collections.community.docker.plugins.inventory.docker_swarm import InventoryModule
+
+
+@pytest.fixture
+def inventory():
+    r = InventoryModule()
+    r.inventory = InventoryData()
+    return r
+
+
+MANAGER_LEADER = {
+    'ID': 'n5yvwlpjyzgg7fpgw3sfivjd8',
+    'Spec': {
+        'Role': 'manager',
+        'Availability': 'active',
+    },
+    'Description': {
+        'Hostname': 'manager-1',
+    },
+    'Status': {
+        'State': 'ready',
+        'Addr': '192.168.1.10',
+    },
+    'ManagerStatus': {
+        'Leader': True,
+        'Reachability': 'reachable',
+        'Addr': '192.168.1.10:2377',
+    },
+}
+
+
+MANAGER = {
+    'ID': 'x4h6ckp3p5qihm2gx8ifyhrqz',
+    'Spec': {
+        'Role': 'manager',
+        'Availability': 'active',
+    },
+    'Description': {
+        'Hostname': 'manager-2',
+    },
+    'Status': {
+        'State': 'ready',
+        'Addr': '192.168.1.11',
+    },
+    'ManagerStatus': {
+        'Reachability': 'reachable',
+        'Addr': '192.168.1.11:2377',
+    },
+}
+
+
+WORKER = {
+    'ID': 'u4b9cjzst2oe6dyw9ijnbhu5h',
+    'Spec': {
+        'Role': 'worker',
+        'Availability': 'active',
+    },
+    'Description': {
+        'Hostname': 'worker-1',
+    },
+    'Status': {
+        'State': 'ready',
+        'Addr': '192.168.1.20',
+    },
+}
+
+
+def create_get_option(options, default=False):
+    def get_option(option):
+        if option in options:
+            return options[option]
+        return default
+
+    return get_option
+
+
+def test_populate(inventory, mocker):
+    inventory.get_option = mocker.MagicMock(side_effect=create_get_option({
+        'verbose_output': True,
+        'include_host_uri': True,
+        'include_host_uri_port': None,
+        'compose': {},
+        'groups': {},
+        'keyed_groups': {},
+    }))
+    inventory._populate([MANAGER_LEADER, MANAGER, WORKER])
+
+    leader_vars = inventory.inventory.get_host(MANAGER_LEADER['ID']).get_vars()
+    assert leader_vars['ansible_host'] == '192.168.1.10'
+    assert leader_vars['ansible_host_uri'] == 'tcp://192.168.1.10:2375'
+    assert leader_vars['docker_swarm_node_attributes'] == MANAGER_LEADER
+
+    manager_vars = inventory.inventory.get_host(MANAGER['ID']).get_vars()
+    assert manager_vars['ansible_host'] == '192.168.1.11'
+    assert manager_vars['ansible_host_uri'] == 'tcp://192.168.1.11:2375'
+
+    worker_vars = inventory.inventory.get_host(WORKER['ID']).get_vars()
+    assert worker_vars['ansible_host'] == '192.168.1.20'
+
+    groups = inventory.inventory.groups
+    assert sorted(host.name for host in groups['manager'].hosts) == sorted([MANAGER_LEADER['ID'], MANAGER['ID']])
+    assert [host.name for host in groups['worker'].hosts] == [WORKER['ID']]
+    assert [host.name for host in groups['leader'].hosts] == [MANAGER_LEADER['ID']]
+    assert sorted(host.name for host in groups['nonleaders'].hosts) == sorted([MANAGER['ID'], WORKER['ID']])
+    assert len(inventory.inventory.hosts) == 3
+
+
+def test_populate_minimal(inventory, mocker):
+    inventory.get_option = mocker.MagicMock(side_effect=create_get_option({
+        'verbose_output': False,
+        'include_host_uri': False,
+        'compose': {},
+        'groups': {},
+        'keyed_groups': {},
+    }))
+    inventory._populate([WORKER])
+
+    worker_vars = inventory.inventory.get_host(WORKER['ID']).get_vars()
+    assert worker_vars['ansible_host'] == '192.168.1.20'
+    assert 'ansible_host_uri' not in worker_vars
+    assert 'docker_swarm_node_attributes' not in worker_vars
+
+
+def test_populate_constructed(inventory, mocker):
+    inventory.templar = Templar(loader=None)
+    inventory.get_option = mocker.MagicMock(side_effect=create_get_option({
+        'verbose_output': False,
+        'include_host_uri': False,
+        'strict': True,
+        'compose': {
+            'hostname': trust_as_template('Description.Hostname'),
+        },
+        'groups': {
+            'active': trust_as_template('Spec.Availability == "active"'),
+        },
+        'keyed_groups': [
+            {
+                'prefix': 'role',
+                'key': trust_as_template('Spec.Role'),
+            },
+        ],
+    }, default=None))
+    inventory._populate([MANAGER_LEADER, WORKER])
+
+    assert inventory.inventory.get_host(MANAGER_LEADER['ID']).get_vars()['hostname'] == 'manager-1'
+    assert inventory.inventory.get_host(WORKER['ID']).get_vars()['hostname'] == 'worker-1'
+
+    groups = inventory.inventory.groups
+    assert sorted(host.name for host in groups['active'].hosts) == sorted([MANAGER_LEADER['ID'], WORKER['ID']])
+    assert [host.name for host in groups['role_manager'].hosts] == [MANAGER_LEADER['ID']]
+    assert [host.name for host in groups['role_worker'].hosts] == [WORKER['ID']]
+
+
+@pytest.fixture
+def cached_inventory(inventory, mocker):
+    mocker.patch.object(docker_swarm, 'HAS_DOCKER', True)
+    inventory._read_config_data = mocker.MagicMock()
+    inventory.get_option = mocker.MagicMock(side_effect=create_get_option({
+        'cache': True,
+    }))
+    inventory._cache = {}
+    inventory._get_nodes = mocker.MagicMock(return_value=[WORKER])
+    inventory._populate = mocker.MagicMock()
+    return inventory
+
+
+def test_parse_cache_hit(cached_inventory, mocker):
+    path = '/path/to/docker_swarm.yml'
+    cache_key = cached_inventory.get_cache_key(path)
+    cached_inventory._cache[cache_key] = [MANAGER_LEADER]
+
+    cached_inventory.parse(InventoryData(), mocker.MagicMock(), path, cache=True)
+
+    cached_inventory._get_nodes.assert_not_called()
+    cached_inventory._populate.assert_called_once_with([MANAGER_LEADER])
+    assert cached_inventory._cache[cache_key] == [MANAGER_LEADER]
+
+
+def test_parse_cache_miss(cached_inventory, mocker):
+    path = '/path/to/docker_swarm.yml'
+    cache_key = cached_inventory.get_cache_key(path)
+
+    cached_inventory.parse(InventoryData(), mocker.MagicMock(), path, cache=True)
+
+    cached_inventory._get_nodes.assert_called_once_with()
+    cached_inventory._populate.assert_called_once_with([WORKER])
+    assert cached_inventory._cache[cache_key] == [WORKER]
+
+
+def test_parse_cache_refresh(cached_inventory, mocker):
+    path = '/path/to/docker_swarm.yml'
+    cache_key = cached_inventory.get_cache_key(path)
+    cached_inventory._cache[cache_key] = [MANAGER_LEADER]
+
+    cached_inventory.parse(InventoryData(), mocker.MagicMock(), path, cache=False)
+
+    cached_inventory._get_nodes.assert_called_once_with()
+    cached_inventory._populate.assert_called_once_with([WORKER])
+    assert cached_inventory._cache[cache_key] == [WORKER]
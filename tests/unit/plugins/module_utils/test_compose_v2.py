@@ -5,10 +5,24 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import re
+
 import pytest
 
 from ansible_collections.community.docker.plugins.module_utils.compose_v2 import (
+    DOCKER_STATUS_ERROR,
+    DOCKER_STATUS_WORKING,
+    BaseComposeManager,
+    Event,
+    _regex_alternation,
+    combine_binary_output,
+    combine_text_output,
+    emit_warnings,
+    extract_actions,
+    has_changes,
+    is_failed,
     parse_events,
+    summarize_events,
 )
 
 from .compose_v2_test_cases import EVENT_TEST_CASES
@@ -29,3 +43,165 @@ def test_parse_events(test_id, compose_version, dry_run, stderr, events, warning
 
     assert events == collected_events
     assert warnings == collected_warnings
+
+
+@pytest.mark.parametrize(
+    'test_id, compose_version, dry_run, stderr, events, warnings',
+    EVENT_TEST_CASES,
+    ids=[tc[0] for tc in EVENT_TEST_CASES],
+)
+def test_parse_events_lines(test_id, compose_version, dry_run, stderr, events, warnings):
+    collected_warnings = []
+
+    def collect_warning(msg):
+        collected_warnings.append(msg)
+
+    lines = iter(stderr.encode('utf-8').splitlines(True))
+    collected_events = parse_events(lines, dry_run=dry_run, warn_function=collect_warning)
+
+    assert events == collected_events
+    assert warnings == collected_warnings
+
+
+@pytest.mark.parametrize('stderr', [
+    b' Container foo  Started\n Container bar \x0c Creating\n',
+    ' Container foo  Started\r\n Container bar \x0c Creating\r\n',
+    ' Container foo  Started\r Container bar \x0c Creating',
+])
+def test_parse_events_line_separators(stderr):
+    collected_events = parse_events(stderr, warn_function=pytest.fail)
+
+    assert collected_events == [
+        Event('container', 'foo', 'Started', None),
+        Event('container', 'bar', 'Creating', None),
+    ]
+
+
+REGEX_ALTERNATION_TEST_CASES = [
+    (['Pulled', 'Pulling'], 'Pull(?:ed|ing)'),
+    (['Pulling', 'Pulled'], 'Pull(?:ed|ing)'),
+    (['Error'], 'Error'),
+    (['Start', 'Started', 'Starting'], 'Start(?:ed|ing)?'),
+    (['a.b', 'a+c'], 'a(?:\\+c|\\.b)'),
+]
+
+
+@pytest.mark.parametrize('strings, expected', REGEX_ALTERNATION_TEST_CASES + [([], '')])
+def test_regex_alternation(strings, expected):
+    assert _regex_alternation(strings) == expected
+
+
+@pytest.mark.parametrize('strings', [strings for strings, dummy in REGEX_ALTERNATION_TEST_CASES])
+def test_regex_alternation_matches(strings):
+    regex = re.compile('^(?:%s)$' % _regex_alternation(strings))
+    naive_regex = re.compile('^(?:%s)$' % '|'.join(re.escape(string) for string in strings))
+    candidates = set(strings)
+    for string in strings:
+        for i in range(len(string) + 1):
+            candidates.add(string[:i])
+            candidates.add(string[i:])
+            candidates.add(string + 'x')
+    for candidate in sorted(candidates):
+        assert bool(regex.match(candidate)) == bool(naive_regex.match(candidate)), candidate
+
+
+@pytest.mark.parametrize(
+    'test_id, compose_version, dry_run, stderr, events, warnings',
+    EVENT_TEST_CASES,
+    ids=[tc[0] for tc in EVENT_TEST_CASES],
+)
+def test_summarize_events(test_id, compose_version, dry_run, stderr, events, warnings):
+    summary = summarize_events(events)
+
+    working_events = [event for event in events if event.status in DOCKER_STATUS_WORKING]
+    assert summary.changed == bool(working_events)
+    assert summary.actions == [
+        {
+            'what': event.resource_type,
+            'id': event.resource_id,
+            'status': event.status,
+        }
+        for event in working_events
+    ]
+    assert summary.errors == [event for event in events if event.status in DOCKER_STATUS_ERROR]
+    assert summary.warnings == [event for event in events if event.status is None and event.msg is not None]
+
+    assert has_changes(events) == summary.changed
+    assert extract_actions(events) == summary.actions
+    assert is_failed(events, 0) == bool(summary.errors)
+    assert is_failed(events, 1)
+    collected_warnings = []
+    emit_warnings(events, collected_warnings.append)
+    assert len(collected_warnings) == len(summary.warnings)
+
+
+@pytest.mark.parametrize('outputs, expected', [
+    ((), ''),
+    ((None, ''), ''),
+    (('foo', None), 'foo'),
+    (('', 'foo'), 'foo'),
+    (('foo', 'bar'), 'foo\nbar'),
+    (('foo', '', 'bar', None, 'baz'), 'foo\nbar\nbaz'),
+])
+def test_combine_output(outputs, expected):
+    assert combine_text_output(*outputs) == expected
+    binary_outputs = [out.encode('utf-8') if out is not None else None for out in outputs]
+    assert combine_binary_output(*binary_outputs) == expected.encode('utf-8')
+
+
+def test_list_containers(mocker):
+    # Avoid the constructor, which queries the Docker CLI and checks the project directory
+    manager = BaseComposeManager.__new__(BaseComposeManager)
+    manager.list_containers_raw = mocker.MagicMock(return_value=[
+        {
+            'Name': 'no-labels',
+            'Labels': '',
+            'Networks': '',
+        },
+        {
+            'Name': 'labels',
+            'Names': 'labels,alias',
+            'Labels': 'a=b,c',
+            'Networks': 'default,other',
+            'Publishers': [{'URL': '0.0.0.0', 'TargetPort': 80}],
+        },
+        {
+            'Name': 'value-with-equal-sign',
+            'Labels': 'a=b=c',
+        },
+    ])
+
+    containers = manager.list_containers()
+
+    assert containers == [
+        {
+            'Name': 'no-labels',
+            'Names': ['no-labels'],
+            'Labels': {},
+            'Networks': [],
+            'Publishers': [],
+        },
+        {
+            'Name': 'labels',
+            'Names': ['labels', 'alias'],
+            'Labels': {'a': 'b', 'c': ''},
+            'Networks': ['default', 'other'],
+            'Publishers': [{'URL': '0.0.0.0', 'TargetPort': 80}],
+        },
+        {
+            'Name': 'value-with-equal-sign',
+            'Names': ['value-with-equal-sign'],
+            'Labels': {'a': 'b=c'},
+            'Networks': [],
+            'Publishers': [],
+        },
+    ]
+
+
+def test_call_cli(mocker):
+    manager = BaseComposeManager.__new__(BaseComposeManager)
+    manager.client = mocker.MagicMock()
+    manager.client.call_cli.return_value = (1, b'out \xc3\xa4', b'err')
+
+    assert manager.call_cli('compose', 'up', cwd='/path') == (1, u'out \u00e4', 'err')
+    manager.client.call_cli.assert_called_once_with('compose', 'up', cwd='/path')